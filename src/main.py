@@ -1,7 +1,71 @@
 import flet as ft
-import json
+import functools
+import mmap
+import os
+import orjson
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, FrozenSet, Set, Tuple
+
+# JSON解析只会产生原生dict，热循环里用类型同一性判断代替isinstance调度
+_dict = dict
+
+# 差异列表每次滚动到底部时追加的条目数
+_PAGE_SIZE = 200
+
+# 无差异时的提示不含任何动态内容，构建一次后每次比较直接复用
+_ALL_MATCH_CARD = ft.Container(
+    content=ft.Text(
+        "✅ 两个文件的key完全匹配！",
+        size=20,
+        weight=ft.FontWeight.BOLD,
+        color=ft.Colors.GREEN,
+    ),
+    alignment=ft.alignment.center,
+    padding=20,
+)
+
+
+def _stats_card(
+    file1_name: str,
+    file2_name: str,
+    only_in_file1: FrozenSet[str],
+    only_in_file2: FrozenSet[str],
+    common_keys: FrozenSet[str],
+) -> ft.Card:
+    """
+    构建比较结果统计卡片
+    """
+    n_only1 = len(only_in_file1)
+    n_only2 = len(only_in_file2)
+    n_common = len(common_keys)
+
+    return ft.Card(
+        content=ft.Container(
+            content=ft.Column(
+                [
+                    ft.Text("比较结果统计", size=18, weight=ft.FontWeight.BOLD),
+                    ft.Divider(),
+                    ft.Text(f"{file1_name} 总key数: {n_only1 + n_common}"),
+                    ft.Text(f"{file2_name} 总key数: {n_only2 + n_common}"),
+                    ft.Text(
+                        f"相同key数: {n_common}",
+                        color=ft.Colors.GREEN,
+                    ),
+                    ft.Text(
+                        f"仅存在于 {file1_name} 的key数: {n_only1}",
+                        color=ft.Colors.ORANGE if n_only1 else ft.Colors.GREEN,
+                    ),
+                    ft.Text(
+                        f"仅存在于 {file2_name} 的key数: {n_only2}",
+                        color=ft.Colors.ORANGE if n_only2 else ft.Colors.GREEN,
+                    ),
+                ]
+            ),
+            padding=15,
+        )
+    )
 
 
 class JSONComparatorApp:
@@ -12,105 +76,151 @@ class JSONComparatorApp:
         self.pick_files_dialog = ft.FilePicker()
         self.save_file_dialog = ft.FilePicker()
 
-    def extract_keys(self, data: Dict, prefix: str = "") -> List[str]:
-        """
-        递归提取JSON中的所有key，支持嵌套结构，保持顺序
+    @staticmethod
+    def extract_keys(data: Dict, prefix: str = "") -> Set[str]:
         """
-        keys = []
-
-        for key, value in data.items():
-            full_key = f"{prefix}.{key}" if prefix else key
+        迭代提取JSON中的所有key，支持嵌套结构
 
-            if isinstance(value, dict):
-                # 递归处理嵌套字典，保持深度优先的顺序
-                nested_keys = self.extract_keys(value, full_key)
-                keys.extend(nested_keys)
+        用显式栈代替递归，避免每层嵌套的函数调用开销和临时集合合并
+        """
+        # 典型i18n语言包是纯平铺结构：没有嵌套时顶层key就是全部叶子key，
+        # any在遇到第一个嵌套dict时即短路，额外扫描代价很小
+        if not prefix and not any(type(v) is _dict for v in data.values()):
+            return set(data.keys())
+
+        keys = set()
+        stack = [(prefix, data)]
+        # 热循环中反复用到的方法绑定成局部变量，省去每个节点的属性查找
+        add = keys.add
+        push = stack.append
+        pop = stack.pop
+        intern = sys.intern
+
+        # intern后两个文件的相同key共享同一对象，集合运算的相等比较退化为指针比较
+        while stack:
+            p, d = pop()
+            if p:
+                # 前缀拼接每个dict只做一次，叶子循环里走C级字符串连接而非f-string
+                prefix_dot = p + "."
+                for key, value in d.items():
+                    full_key = prefix_dot + key
+                    if type(value) is _dict:
+                        push((full_key, value))
+                    else:
+                        add(intern(full_key))
             else:
-                keys.append(full_key)
+                for key, value in d.items():
+                    if type(value) is _dict:
+                        push((key, value))
+                    else:
+                        add(intern(key))
 
         return keys
 
-    def load_json_from_file(self, file_path: str) -> Dict:
+    @staticmethod
+    def load_json_from_file(file_path: str) -> Dict:
         """
         从文件路径加载JSON数据
         """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            # mmap映射文件后零拷贝交给orjson解析，避免read()先复制一份完整缓冲
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+                try:
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        # 解析是线性扫描，提示内核按顺序预读
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    if hasattr(mmap, "MADV_WILLNEED"):
+                        # 解析开始前就把整个文件的异步预读提交给内核，
+                        # 两个加载线程的读请求因此能同时在队列中流水执行
+                        mm.madvise(mmap.MADV_WILLNEED)
+                    # orjson只接受bytes/memoryview等，映射需经memoryview零拷贝传入
+                    return orjson.loads(memoryview(mm))
+                finally:
+                    mm.close()
+            finally:
+                os.close(fd)
         except Exception as e:
             raise Exception(f"加载JSON文件失败: {e}")
 
+    def load_keys_from_file(self, file_path: str) -> Set[str]:
+        """
+        加载JSON文件并直接提取key集合
+
+        结果按(路径, mtime)缓存：用同一个基准文件连续比较多个语言包时，
+        基准文件只需解析一次，文件被修改后mtime变化自动使缓存失效
+        """
+        return _load_keys_cached(file_path, os.stat(file_path).st_mtime_ns)
+
     def compare_json_files(
         self, file1_path: str, file2_path: str
-    ) -> Tuple[List[str], List[str], List[str]]:
+    ) -> Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]:
         """
-        比较两个JSON文件的key，保持顺序
+        比较两个JSON文件的key
         """
-        data1 = self.load_json_from_file(file1_path)
-        data2 = self.load_json_from_file(file2_path)
-
-        # 提取key（已保持顺序）
-        keys1 = self.extract_keys(data1)
-        keys2 = self.extract_keys(data2)
-
-        # 为了快速查找，使用集合
-        keys1_set = set(keys1)
-        keys2_set = set(keys2)
-
-        # 保持原始顺序
-        only_in_file1 = [key for key in keys1 if key not in keys2_set]
-        only_in_file2 = [key for key in keys2 if key not in keys1_set]
-        common_keys = [key for key in keys1 if key in keys2_set]
-
-        return only_in_file1, only_in_file2, common_keys
+        # 并行加载+提取：orjson解析时释放GIL，两个文件的解析和key提取相互重叠
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            future1 = executor.submit(self.load_keys_from_file, file1_path)
+            future2 = executor.submit(self.load_keys_from_file, file2_path)
+            keys1 = future1.result()
+            keys2 = future2.result()
+
+        # 以较小的集合为主导做交集，再复用交集求差集，减少对大集合的重复哈希探测
+        small, big = (keys1, keys2) if len(keys1) <= len(keys2) else (keys2, keys1)
+        common_keys = small & big
+        only_in_small = small - common_keys
+        only_in_big = big - common_keys
+
+        if small is keys1:
+            only_in_file1, only_in_file2 = only_in_small, only_in_big
+        else:
+            only_in_file1, only_in_file2 = only_in_big, only_in_small
+
+        # 结果只读，冻结后下游可以安全复用且可哈希
+        return (
+            frozenset(only_in_file1),
+            frozenset(only_in_file2),
+            frozenset(common_keys),
+        )
 
     def save_comparison_report(
         self,
         file1_name: str,
         file2_name: str,
-        only_in_file1: List[str],
-        only_in_file2: List[str],
-        common_keys: List[str],
+        only_in_file1: FrozenSet[str],
+        only_in_file2: FrozenSet[str],
+        common_keys: FrozenSet[str],
         save_path: str,
     ):
         """
-        保存比较报告到文件，保持key的原始顺序
+        保存JSON格式的比较报告
         """
-        report_lines = []
-        report_lines.append(f"JSON Key 比较报告: {file1_name} vs {file2_name}")
-        report_lines.append("=" * 50)
-        report_lines.append("")
-
-        # 统计信息
-        report_lines.append("统计信息:")
-        report_lines.append(
-            f"  {file1_name} 总key数: {len(only_in_file1) + len(common_keys)}"
-        )
-        report_lines.append(
-            f"  {file2_name} 总key数: {len(only_in_file2) + len(common_keys)}"
-        )
-        report_lines.append(f"  共有key数: {len(common_keys)}")
-        report_lines.append(f"  仅存在于 {file1_name} 的key数: {len(only_in_file1)}")
-        report_lines.append(f"  仅存在于 {file2_name} 的key数: {len(only_in_file2)}")
-        report_lines.append("")
-
-        # 仅存在于file1的key - 保持原顺序
-        if only_in_file1:
-            report_lines.append(f"仅存在于 {file1_name} 的key:")
-            report_lines.append("-" * 40)
-            for key in only_in_file1:  # 直接使用已排序的列表
-                report_lines.append(f"  {key}")
-            report_lines.append("")
-
-        # 仅存在于file2的key - 保持原顺序
-        if only_in_file2:
-            report_lines.append(f"仅存在于 {file2_name} 的key:")
-            report_lines.append("-" * 40)
-            for key in only_in_file2:  # 直接使用已排序的列表
-                report_lines.append(f"  {key}")
-
-        with open(save_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(report_lines))
+        n_only1 = len(only_in_file1)
+        n_only2 = len(only_in_file2)
+        n_common = len(common_keys)
+
+        report = {
+            "file1": file1_name,
+            "file2": file2_name,
+            "stats": {
+                "file1_total_keys": n_only1 + n_common,
+                "file2_total_keys": n_only2 + n_common,
+                "common_keys": n_common,
+                "only_in_file1": n_only1,
+                "only_in_file2": n_only2,
+            },
+            "only_in_file1": list(only_in_file1),
+            "only_in_file2": list(only_in_file2),
+        }
+
+        # orjson在C层一次性序列化进预分配缓冲，单次write写出
+        with open(save_path, "wb") as f:
+            f.write(
+                orjson.dumps(
+                    report, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2
+                )
+            )
 
     def main(self, page: ft.Page):
         # 页面设置
@@ -203,60 +313,50 @@ class JSONComparatorApp:
                 file1_name = Path(self.file1_path).name
                 file2_name = Path(self.file2_path).name
 
-                stats_card = ft.Card(
-                    content=ft.Container(
-                        content=ft.Column(
-                            [
-                                ft.Text(
-                                    "比较结果统计", size=18, weight=ft.FontWeight.BOLD
-                                ),
-                                ft.Divider(),
-                                ft.Text(
-                                    f"{file1_name} 总key数: {len(only_in_file1) + len(common_keys)}"
-                                ),
-                                ft.Text(
-                                    f"{file2_name} 总key数: {len(only_in_file2) + len(common_keys)}"
-                                ),
-                                ft.Text(
-                                    f"相同key数: {len(common_keys)}",
-                                    color=ft.Colors.GREEN,
-                                ),
-                                ft.Text(
-                                    f"仅存在于 {file1_name} 的key数: {len(only_in_file1)}",
-                                    color=ft.Colors.ORANGE
-                                    if only_in_file1
-                                    else ft.Colors.GREEN,
-                                ),
-                                ft.Text(
-                                    f"仅存在于 {file2_name} 的key数: {len(only_in_file2)}",
-                                    color=ft.Colors.ORANGE
-                                    if only_in_file2
-                                    else ft.Colors.GREEN,
-                                ),
-                            ]
-                        ),
-                        padding=15,
+                result_ref.current.controls.append(
+                    _stats_card(
+                        file1_name,
+                        file2_name,
+                        only_in_file1,
+                        only_in_file2,
+                        common_keys,
                     )
                 )
-                result_ref.current.controls.append(stats_card)
 
-                # 显示缺失的key - 保持原顺序
+                def build_key_list(keys):
+                    # 懒加载：先物化第一页ListTile，滚动接近底部再追加下一页，
+                    # 避免几万key的diff一次性创建同样数量的控件；
+                    # 排序一次保证展示顺序稳定，不随集合哈希顺序变化
+                    key_tuple = tuple(sorted(keys))
+                    list_view = ft.ListView(height=200, spacing=1)
+
+                    def load_page():
+                        start = len(list_view.controls)
+                        list_view.controls.extend(
+                            ft.ListTile(title=ft.Text(key))
+                            for key in key_tuple[start : start + _PAGE_SIZE]
+                        )
+
+                    def on_scroll(se: ft.OnScrollEvent):
+                        if (
+                            len(list_view.controls) < len(key_tuple)
+                            and se.pixels >= se.max_scroll_extent - 100
+                        ):
+                            load_page()
+                            page.update()
+
+                    list_view.on_scroll = on_scroll
+                    load_page()
+                    return list_view
+
+                # 显示缺失的key
                 if only_in_file1:
                     missing_keys1 = ft.ExpansionTile(
                         title=ft.Text(
                             f"仅存在于 {file1_name} 的key ({len(only_in_file1)}个)"
                         ),
                         subtitle=ft.Text("点击展开查看详情", color=ft.Colors.GREY),
-                        controls=[
-                            ft.ListView(
-                                [
-                                    ft.ListTile(title=ft.Text(key))
-                                    for key in only_in_file1
-                                ],  # 保持原顺序
-                                height=200,
-                                spacing=1,
-                            )
-                        ],
+                        controls=[build_key_list(only_in_file1)],
                     )
                     result_ref.current.controls.append(missing_keys1)
 
@@ -266,33 +366,13 @@ class JSONComparatorApp:
                             f"仅存在于 {file2_name} 的key ({len(only_in_file2)}个)"
                         ),
                         subtitle=ft.Text("点击展开查看详情", color=ft.Colors.GREY),
-                        controls=[
-                            ft.ListView(
-                                [
-                                    ft.ListTile(title=ft.Text(key))
-                                    for key in only_in_file2
-                                ],  # 保持原顺序
-                                height=200,
-                                spacing=1,
-                            )
-                        ],
+                        controls=[build_key_list(only_in_file2)],
                     )
                     result_ref.current.controls.append(missing_keys2)
 
                 # 如果没有差异
                 if not only_in_file1 and not only_in_file2:
-                    result_ref.current.controls.append(
-                        ft.Container(
-                            content=ft.Text(
-                                "✅ 两个文件的key完全匹配！",
-                                size=20,
-                                weight=ft.FontWeight.BOLD,
-                                color=ft.Colors.GREEN,
-                            ),
-                            alignment=ft.alignment.center,
-                            padding=20,
-                        )
-                    )
+                    result_ref.current.controls.append(_ALL_MATCH_CARD)
 
             except Exception as ex:
                 page.open(
@@ -384,8 +464,8 @@ class JSONComparatorApp:
                     "保存报告",
                     icon=ft.Icons.SAVE,
                     on_click=lambda _: self.save_file_dialog.save_file(
-                        allowed_extensions=["txt"],
-                        file_name="json_comparison_report.txt",
+                        allowed_extensions=["json"],
+                        file_name="json_comparison_report.json",
                     ),
                 ),
             ],
@@ -406,6 +486,16 @@ class JSONComparatorApp:
         )
 
 
+@functools.lru_cache(maxsize=8)
+def _load_keys_cached(file_path: str, mtime_ns: int) -> Set[str]:
+    # mtime_ns只作为缓存key参与失效；模块级缓存让所有会话共享，
+    # 解析和提取合并为一步，中间dict用完即回收，
+    # 比较阶段不会同时持有两棵完整的JSON树
+    return JSONComparatorApp.extract_keys(
+        JSONComparatorApp.load_json_from_file(file_path)
+    )
+
+
 def main(page: ft.Page):
     app = JSONComparatorApp()
     app.main(page)